@@ -1,132 +1,275 @@
+// Build: g++ -O3 -march=native -fopenmp main.c++ -o queens
+// Trials run in parallel when compiled with OpenMP; without -fopenmp the
+// pragma is ignored and they run one after another. -march=native turns on
+// BMI2 (PDEP) and hardware popcount where the CPU has them.
+
 #include <iostream>
 #include <vector>
+#include <chrono>
+#include <cstdint>
 #include <ctime>
-#include <cstdlib>
-#include <algorithm>
 #include <cmath>
-#include <random>
+#ifdef __BMI2__
+#include <immintrin.h>
+#endif
 
 using namespace std;
 
-const int N = 12; // Board size
+constexpr int N = 12; // Board size
+
+// Counters for one trial. Every trial keeps its own so trials can run
+// concurrently without sharing state.
+struct TrialResult {
+    long long solutionCount = 0;
+    long long operationCount = 0;
+};
 
-// Global counter for tracking operations
-long long operationCount = 0;
-long long solutionCount = 0;
+// Queens already placed are tracked as bitmasks: bit j of cols is set when
+// column j is taken, and diag1/diag2 hold the columns attacked along the two
+// diagonals in the current row.
+constexpr unsigned FULL = (1u << N) - 1;
+static_assert(N >= 1 && N <= 31, "board masks must fit in 32-bit unsigned (N <= 16 without BMI2)");
+
+// Return the mask of promising columns for the current row
+unsigned promisingColumns(unsigned cols, unsigned diag1, unsigned diag2) {
+    return ~(cols | diag1 | diag2) & FULL;
+}
 
 // column[i] = j means queen in row i is at column j
-// Check if placing a queen at row i, column[i] is safe
-bool isPromising(vector<int>& column, int row) {
-    operationCount++; // Count constraint checks
+// Count the operations of testing every column of this row the original
+// way: each test costs 1, plus 1 per earlier row checked, stopping at the
+// first earlier queen that shares the column or a diagonal.
+long long constraintCheckCount(const int column[], int row) {
+    // checked[col] = number of earlier rows scanned before the test stops
+    int checked[N];
+    for (int col = 0; col < N; col++) {
+        checked[col] = row; // no conflict: every earlier row is checked
+    }
     
-    // Check against all previously placed queens (rows 0 to row-1)
-    for (int i = 0; i < row; i++) {
-        operationCount++;
-        
-        // Check if in same column
-        if (column[i] == column[row]) {
-            return false;
-        }
-        
-        // Check if on same diagonal
-        // Two queens are on same diagonal if |row1 - row2| == |col1 - col2|
-        if (abs(column[i] - column[row]) == abs(i - row)) {
-            return false;
+    // Walk from the nearest row up so the earliest attacker wins
+    for (int i = row - 1; i >= 0; i--) {
+        int d = row - i;
+        checked[column[i]] = i + 1;
+        if (column[i] + d < N) checked[column[i] + d] = i + 1;
+        if (column[i] - d >= 0) checked[column[i] - d] = i + 1;
+    }
+    
+    long long count = N;
+    for (int col = 0; col < N; col++) {
+        count += checked[col];
+    }
+    return count;
+}
+
+#ifdef __BMI2__
+// Return the k-th set bit (0-based, from the least significant end) of mask.
+// PDEP deposits the single bit 1 << k into the k-th set position of mask.
+unsigned selectBit(unsigned mask, int k) {
+    return _pdep_u32(1u << k, mask);
+}
+
+void initSelectBitTable() {}
+#else
+// The table takes 2^N * N bytes, so keep it to boards of 16 or fewer
+static_assert(N <= 16, "setBits lookup table needs 2^N * N bytes; build with BMI2 for larger N");
+
+// setBits[mask][k] = column of the k-th set bit of mask
+signed char setBits[1 << N][N];
+
+void initSelectBitTable() {
+    for (unsigned mask = 0; mask <= FULL; mask++) {
+        int k = 0;
+        for (int col = 0; col < N; col++) {
+            if (mask & (1u << col)) {
+                setBits[mask][k++] = col;
+            }
         }
     }
-    return true;
 }
 
-// Monte Carlo backtracking - randomly select one promising child per level
-bool solveNQueensMonteCarlo(vector<int>& column, int row, long long &solutionCount) {
-    operationCount++; // Count node visits
+// Return the k-th set bit (0-based, from the least significant end) of mask
+unsigned selectBit(unsigned mask, int k) {
+    return 1u << setBits[mask][k];
+}
+#endif
+
+// xoshiro256** generator: a few shifts and xors per draw, and a state small
+// enough to live on each trial's stack
+struct Xoshiro256 {
+    uint64_t s[4];
     
-    // Base case: all queens placed successfully
-    if (row >= N) {
-        solutionCount++;
-        return true; // Found a solution
+    // Expand a single seed into the four state words with SplitMix64
+    explicit Xoshiro256(uint64_t seed) {
+        for (int i = 0; i < 4; i++) {
+            uint64_t z = (seed += 0x9e3779b97f4a7c15ULL);
+            z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ULL;
+            z = (z ^ (z >> 27)) * 0x94d049bb133111ebULL;
+            s[i] = z ^ (z >> 31);
+        }
     }
     
-    // Find all promising columns for this row
-    vector<int> promisingCols;
-    for (int col = 0; col < N; col++) {
-        column[row] = col;
-        if (isPromising(column, row)) {
-            promisingCols.push_back(col);
-        }
+    static uint64_t rotl(uint64_t x, int k) {
+        return (x << k) | (x >> (64 - k));
     }
     
-    // If no promising children, backtrack
-    if (promisingCols.empty()) {
-        return false;
+    uint64_t next() {
+        uint64_t result = rotl(s[1] * 5, 7) * 9;
+        uint64_t t = s[1] << 17;
+        s[2] ^= s[0];
+        s[3] ^= s[1];
+        s[1] ^= s[2];
+        s[0] ^= s[3];
+        s[2] ^= t;
+        s[3] = rotl(s[3], 45);
+        return result;
     }
+};
+
+// Return a random index in [0, m) by scaling the top 32 bits of one draw
+// (multiply-shift), avoiding a distribution object and a division per row
+int randomBelow(Xoshiro256 &rng, unsigned m) {
+    return (int)(((rng.next() >> 32) * m) >> 32);
+}
+
+// Monte Carlo backtracking - randomly select one promising child per level.
+// Only one child is followed at each level, so the probe is a straight loop
+// down the tree with the board state kept in three local masks and the
+// operation count in a local returned with the result.
+TrialResult solveNQueensMonteCarlo(Xoshiro256 &rng) {
+    unsigned cols = 0, diag1 = 0, diag2 = 0;
+    int column[N] = {}; // Placements, kept only to count constraint checks
+    long long operationCount = 0;
     
-    // MONTE CARLO: Randomly select ONE promising child
-    int randomIndex = rand() % promisingCols.size();
-    column[row] = promisingCols[randomIndex];
+    // N is a compile-time constant, so the row loop has a fixed trip count
+    // and can be unrolled with the masks kept in registers
+    #pragma GCC unroll 16
+    for (int row = 0; row < N; row++) {
+        operationCount++; // Count node visits
+        
+        // Find all promising columns for this row
+        unsigned promising = promisingColumns(cols, diag1, diag2);
+        operationCount += constraintCheckCount(column, row); // Count constraint checks
+        
+        // If no promising children, backtrack
+        if (promising == 0) {
+            return {0, operationCount};
+        }
+        
+        // MONTE CARLO: Randomly select ONE promising child
+        int randomIndex = randomBelow(rng, __builtin_popcount(promising));
+        unsigned bit = selectBit(promising, randomIndex);
+        
+        // Descend into the randomly selected column
+        column[row] = __builtin_ctz(bit);
+        cols |= bit;
+        diag1 = ((diag1 | bit) << 1) & FULL;
+        diag2 = (diag2 | bit) >> 1;
+    }
     
-    // Recursively solve with the randomly selected column
-    return solveNQueensMonteCarlo(column, row + 1, solutionCount);
+    // All queens placed successfully
+    operationCount++; // Count the leaf visit
+    return {1, operationCount}; // Found a solution
 }
 
 // Run one Monte Carlo trial
-long long runTrial(int trialNum) {
-    operationCount = 0; // Reset counter for this trial
-    solutionCount = 0;  // Reset solution count for this trial
-    
-    vector<int> column(N, -1); // column[row] = col position of queen
+TrialResult runTrial(int trialNum, unsigned baseSeed) {
+    // Seed a generator private to this trial; distinct trials get distinct
+    // seeds, and the same base seed reproduces the same run
+    Xoshiro256 rng(baseSeed + trialNum * 1000ULL);
     
-    // Seed random for this trial
-    srand(time(NULL) + trialNum * 1000);
-    
-    solveNQueensMonteCarlo(column, 0, solutionCount);
+    return solveNQueensMonteCarlo(rng);
+}
+
+// Running count, mean, variance (Welford's method), minimum and maximum,
+// updated one value at a time in a single pass
+struct RunningStats {
+    long long count = 0;
+    double mean = 0.0;
+    double m2 = 0.0; // Sum of squared deviations from the mean
+    long long minimum = 0;
+    long long maximum = 0;
     
-    cout << "Trial " << trialNum << ": " 
-         << "Solutions: " << solutionCount
-         << " - Operations: " << operationCount << endl;
+    void add(long long x) {
+        if (count == 0 || x < minimum) minimum = x;
+        if (count == 0 || x > maximum) maximum = x;
+        count++;
+        double delta = x - mean;
+        mean += delta / count;
+        m2 += delta * (x - mean);
+    }
     
-    return operationCount;
-}
+    // Sample variance (n - 1 denominator)
+    double variance() const {
+        return count > 1 ? m2 / (count - 1) : 0.0;
+    }
+};
 
 // Calculate statistics
 void printStatistics(vector<long long>& numOps) {
     // TODO: Calculate and print:
-    // - Minimum operations
-    // - Maximum operations
-    // - Average operations
     // - Median operations
-    // - Standard deviation
+    RunningStats stats;
     cout << "\nStatistics:" << endl;
     cout << "Operations performed " << numOps.size() << " number of trials:" << endl;
     for (size_t i = 0; i < numOps.size(); i++) {
-        cout << "Trial " << (i + 1) << ": " << numOps[i] << " operations" << endl;
+        cout << "Trial " << (i + 1) << ": " << numOps[i] << " operations" << '\n';
+        stats.add(numOps[i]);
     }
+    
+    cout << "Minimum operations: " << stats.minimum << endl;
+    cout << "Maximum operations: " << stats.maximum << endl;
+    cout << "Average operations: " << stats.mean << endl;
+    cout << "Standard deviation: " << sqrt(stats.variance()) << endl;
+
+}
 
+// Run every trial and return the wall-clock time they took, in seconds.
+// Nothing is printed here, so threads never wait on output. Results go into
+// one contiguous array per counter, indexed by trial.
+double runAllTrials(vector<long long>& solutions, vector<long long>& numOps, unsigned baseSeed) {
+    int numTrials = numOps.size();
+    auto startTime = chrono::steady_clock::now();
+    
+    // Run multiple trials; they are independent, so split them across threads
+    #pragma omp parallel for schedule(static)
+    for (int i = 1; i <= numTrials; i++) {
+        TrialResult result = runTrial(i, baseSeed);
+        solutions[i - 1] = result.solutionCount;
+        numOps[i - 1] = result.operationCount;
+    }
+    
+    auto endTime = chrono::steady_clock::now();
+    return chrono::duration<double>(endTime - startTime).count();
 }
 
 int main() {
-    srand(time(NULL));
+    initSelectBitTable();
     
     int numTrials;
     cout << "Enter number of Monte Carlo trials: ";
     cin >> numTrials;
+    if (numTrials < 0) {
+        numTrials = 0; // Run no trials rather than size vectors negatively
+    }
     
-    vector<long long> numOps;
+    unsigned baseSeed = time(NULL); // Read once so every trial derives from it
+    vector<long long> solutions(numTrials);
+    vector<long long> numOps(numTrials);
     
     cout << "\n=== Running Monte Carlo Simulation ===" << endl;
-    cout << "Solving " << N << "-Queens problem..." << endl << endl;
+    cout << "Solving " << N << "-Queens problem..." << endl;
+    cout << "Random seed: " << baseSeed << endl << endl;
     
-    clock_t startTime = clock();
+    double totalTime = runAllTrials(solutions, numOps, baseSeed);
     
-    // Run multiple trials
+    // Report trials in order once they have all finished. '\n' rather than
+    // endl avoids flushing the stream once per trial.
     for (int i = 1; i <= numTrials; i++) {
-        long long ops = runTrial(i);
-        numOps.push_back(ops);
+        cout << "Trial " << i << ": " 
+             << "Solutions: " << solutions[i - 1]
+             << " - Operations: " << numOps[i - 1] << '\n';
     }
     
-    clock_t endTime = clock();
-    double totalTime = double(endTime - startTime) / CLOCKS_PER_SEC;
-    
     cout << "\n=== Results ===" << endl;
     cout << "Total execution time: " << totalTime << " seconds" << endl;
     cout << "Average time per trial: " << (totalTime / numTrials) << " seconds" << endl << endl;